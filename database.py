@@ -1,6 +1,8 @@
+import os
 import sqlite3
 
-DB_PATH = "matchmaking.db"
+# Pode ser sobrescrito (ex.: banco temporário do teste de carga)
+DB_PATH = os.environ.get("MATCHMAKING_DB", "matchmaking.db")
 conn = sqlite3.connect(DB_PATH)
 cursor = conn.cursor()
 
@@ -58,6 +60,15 @@ cursor.execute("""
     )
 """)
 
+# Backup das respostas originais alteradas pela migração de respostas tipadas
+cursor.execute("""
+    CREATE TABLE IF NOT EXISTS legacy_responses (
+        user_id TEXT,
+        answers TEXT,
+        migrated_at TEXT
+    )
+""")
+
 conn.commit()
 
 print("Conexão estabelecida e tabelas criadas:", conn)
@@ -0,0 +1,424 @@
+"""
+Teste de carga offline do bot de matchmaking.
+
+Cria objetos falsos de Interaction/Member/Role e reexecuta uma mistura de
+comandos (sintética ou gravada) contra um matchmaking.db temporário, sem
+conexão com o Discord. Ao final exibe vazão, percentis de latência por
+comando e o atraso (lag) do event loop.
+
+Uso:
+    python loadtest.py --users 200 --ops 2000 --concurrency 20
+    python loadtest.py --mix matchmake=5,perfil=2,reject=3
+    python loadtest.py --replay gravacao.jsonl
+
+Formato do arquivo de replay (uma operação por linha):
+    {"command": "search_match", "user": 3, "args": {"key": "love_language", "value": "Presentes"}}
+    {"command": "perfil", "user": 3, "args": {"target": 7}}
+
+Usuários são sempre endereçados pelo índice do membro falso (0 a --users - 1,
+aplicado módulo a quantidade de membros), tanto em "user" quanto em
+"args.target". Sem "user", um membro aleatório executa a operação.
+"""
+import argparse
+import asyncio
+import json
+import os
+import random
+import shutil
+import statistics
+import tempfile
+import time
+
+# O banco temporário precisa ser definido antes de importar o bot
+_tmp_dir = tempfile.mkdtemp(prefix="matchmake_loadtest_")
+os.environ["MATCHMAKING_DB"] = os.path.join(_tmp_dir, "matchmaking.db")
+
+import discord  # noqa: E402
+import database as db  # noqa: E402
+import main  # noqa: E402
+
+###############################
+# Objetos falsos do Discord
+###############################
+
+class FakeAsset:
+    def __init__(self, url):
+        self.url = url
+
+class FakeRole:
+    def __init__(self, role_id, name):
+        self.id = role_id
+        self.name = name
+
+class FakeMember:
+    def __init__(self, member_id, name, roles):
+        self.id = member_id
+        self.name = name
+        self.display_name = name
+        self.mention = f"<@{member_id}>"
+        self.roles = roles
+        self.avatar = None
+        self.default_avatar = FakeAsset(f"https://cdn.discordapp.com/embed/avatars/{member_id % 5}.png")
+        self.sent = 0
+
+    def __str__(self):
+        return self.name
+
+    async def send(self, *args, **kwargs):
+        self.sent += 1
+
+class FakeGuild:
+    def __init__(self, members):
+        self.members = {m.id: m for m in members}
+
+    def get_member(self, member_id):
+        return self.members.get(member_id)
+
+class FakeResponse:
+    """Registra as respostas enviadas pelo bot em vez de chamar a API."""
+    def __init__(self):
+        self.done = False
+        self.modal = None
+        self.view = None
+        self.content = None
+
+    def _finish(self):
+        if self.done:
+            raise RuntimeError("Interação já respondida")
+        self.done = True
+
+    async def send_message(self, content=None, *, embed=None, view=None, ephemeral=False):
+        self._finish()
+        self.content = content
+        self.view = view
+
+    async def send_modal(self, modal):
+        self._finish()
+        self.modal = modal
+
+    async def edit_message(self, *, content=None, embed=None, view=None):
+        self._finish()
+        self.content = content
+        self.view = view
+
+class FakeInteraction:
+    def __init__(self, user, guild, **namespace):
+        self.user = user
+        self.guild = guild
+        self.response = FakeResponse()
+        self.namespace = argparse.Namespace(**namespace)
+
+###############################
+# Preparação do ambiente
+###############################
+
+SEED_QUESTIONS = [
+    ("relationship_value", "O que você mais valoriza em um relacionamento?", "choice", "similarity", 5.0,
+     "Confiança,Comunicação,Compatibilidade Sexual,Interesse em Comum,Independência"),
+    ("love_language", "Qual a sua linguagem do amor?", "choice", "similarity", 5.0,
+     "Palavras de Afirmação,Toque Físico,Tempo de Qualidade,Atos de Serviço,Presentes"),
+    ("dominance_preference", "Você prefere um parceiro dominante ou submisso?", "choice", "complementary", 7.0,
+     "Dominante,Submisso,Versátil"),
+    ("sexual_compatibility", "Importância da compatibilidade sexual (0-100)", "number", "complementary", 8.0, ""),
+    ("shared_hobbies", "Seu parceiro deve compartilhar seus hobbies?", "choice", "similarity", 4.0,
+     "Sim,Não é necessário,Prefiro que tenha hobbies diferentes"),
+]
+
+BDSM_CATEGORIES = ["Dominant", "Submissive", "Sadist", "Masochist", "Brat", "Brat tamer", "Switch"]
+
+def seed_database(rng, roles):
+    """Popula o banco temporário com perguntas, cargos e compatibilidades."""
+    db.cursor.executemany(
+        "INSERT OR REPLACE INTO questions (key, question, type, match_type, weight, choices) VALUES (?, ?, ?, ?, ?, ?)",
+        SEED_QUESTIONS
+    )
+    for role_a in roles:
+        for role_b in roles:
+            db.cursor.execute(
+                "INSERT OR REPLACE INTO role_compatibility (role_from, role_to, score) VALUES (?, ?, ?)",
+                (str(role_a.id), str(role_b.id), rng.uniform(0, 20))
+            )
+    db.cursor.execute("INSERT OR REPLACE INTO gender_roles (role_id, gender) VALUES (?, ?)", (str(roles[0].id), "Feminino"))
+    db.cursor.execute("INSERT OR REPLACE INTO orientation_roles (role_id, orientation) VALUES (?, ?)", (str(roles[1].id), "Bissexual"))
+    db.conn.commit()
+
+def build_members(rng, count, roles):
+    members = []
+    for i in range(count):
+        member_roles = rng.sample(roles, k=rng.randint(1, len(roles)))
+        members.append(FakeMember(10_000 + i, f"usuario{i}", member_roles))
+    return members
+
+def random_raw_answers(rng, questions):
+    """Gera respostas como um usuário as escolheria no modal (texto da opção ou número)."""
+    raw = {}
+    for q in questions:
+        if q["type"] == "choice":
+            raw[q["key"]] = rng.choice(q["choices"])
+        else:
+            raw[q["key"]] = str(rng.randint(0, 100))
+    return raw
+
+###############################
+# Operações
+###############################
+
+class ValidationRejected(Exception):
+    """O bot recusou a operação (ex.: respostas inválidas no modal)."""
+
+def build_modal_submit(modal, raw_answers):
+    """
+    Monta o payload de envio do modal no formato do Discord, tratando cada
+    tipo de componente: Select recebe o valor da opção cujo texto foi
+    informado e TextInput recebe o texto diretamente.
+    """
+    components = []
+    for item in modal.walk_children():
+        if isinstance(item, discord.ui.Select):
+            raw = raw_answers.get(item.custom_id)
+            if raw is None:
+                values = []
+            else:
+                option = next((o for o in item.options if o.label == raw), None)
+                if option is None:
+                    raise ValueError(f"Opção inexistente para {item.custom_id}: {raw!r}")
+                values = [option.value]
+            components.append({"type": 18, "component": {"type": 3, "custom_id": item.custom_id, "values": values}})
+        elif isinstance(item, discord.ui.TextInput):
+            value = raw_answers.get(item.custom_id, "")
+            components.append({"type": 18, "component": {"type": 4, "custom_id": item.custom_id, "value": value}})
+    return components
+
+async def submit_modal(modal, interaction, raw_answers):
+    """Preenche o modal pelo mesmo caminho usado pelo discord.py ao receber um envio."""
+    modal._refresh(interaction, build_modal_submit(modal, raw_answers), {})
+    await modal.on_submit(interaction)
+
+def member_at(ctx, index):
+    """Resolve o índice de um membro falso usado nos arquivos de replay."""
+    return ctx.members[index % len(ctx.members)]
+
+def get_command(name):
+    return main.bot.tree.get_command(name)
+
+async def op_register_match(ctx, user, args):
+    interaction = FakeInteraction(user, ctx.guild)
+    await get_command("register_match").callback(interaction)
+    modal = interaction.response.modal
+    if modal is None:
+        raise ValidationRejected(interaction.response.content)
+    raw = args.get("answers") or random_raw_answers(ctx.rng, ctx.questions)
+    submit = FakeInteraction(user, ctx.guild)
+    await submit_modal(modal, submit, raw)
+    if submit.response.content != "Respostas registradas com sucesso!":
+        raise ValidationRejected(submit.response.content)
+
+async def op_import_test(ctx, user, args):
+    test_input = args.get("test_input") or "\n".join(
+        f"{ctx.rng.randint(0, 100)}% {c}" for c in ctx.rng.sample(BDSM_CATEGORIES, k=4)
+    )
+    interaction = FakeInteraction(user, ctx.guild)
+    await get_command("import_test").callback(interaction, test_input)
+
+async def op_matchmake(ctx, user, args):
+    interaction = FakeInteraction(user, ctx.guild)
+    await get_command("matchmake").callback(interaction)
+    if isinstance(interaction.response.view, main.MatchmakingView):
+        ctx.views.append(interaction.response.view)
+
+async def op_perfil(ctx, user, args):
+    target = member_at(ctx, args["target"]) if "target" in args else ctx.rng.choice(ctx.members)
+    interaction = FakeInteraction(user, ctx.guild)
+    await get_command("perfil").callback(interaction, target)
+
+async def op_search_match(ctx, user, args):
+    if "key" in args:
+        key, value = args["key"], args["value"]
+    else:
+        q = ctx.rng.choice(ctx.questions)
+        key = q["key"]
+        value = ctx.rng.choice(q["choices"]) if q["type"] == "choice" else str(ctx.rng.randint(0, 100))
+    interaction = FakeInteraction(user, ctx.guild, key=key)
+    await get_command("search_match").callback(interaction, key, value)
+
+async def _click(ctx, button_name):
+    """
+    Clica em um botão de uma MatchmakingView aberta anteriormente.
+    Retorna False (operação pulada) se não houver nenhuma view aberta.
+    """
+    if not ctx.views:
+        return False
+    view = ctx.rng.choice(ctx.views)
+    interaction = FakeInteraction(view.origin, ctx.guild)
+    await getattr(view, button_name).callback(interaction)
+    if button_name == "accept_button" or view.index >= len(view.candidate_list):
+        ctx.views.remove(view)
+    return True
+
+async def op_reject(ctx, user, args):
+    return await _click(ctx, "reject_button")
+
+async def op_accept(ctx, user, args):
+    return await _click(ctx, "accept_button")
+
+OPERATIONS = {
+    "register_match": op_register_match,
+    "import_test": op_import_test,
+    "matchmake": op_matchmake,
+    "perfil": op_perfil,
+    "search_match": op_search_match,
+    "reject": op_reject,
+    "accept": op_accept,
+}
+
+DEFAULT_MIX = "register_match=2,import_test=1,matchmake=4,perfil=3,search_match=2,reject=3,accept=1"
+
+def parse_mix(mix_text):
+    mix = {}
+    for part in mix_text.split(","):
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in OPERATIONS:
+            raise SystemExit(f"Operação desconhecida: {name}. Opções: {', '.join(OPERATIONS)}")
+        mix[name] = float(weight or 1)
+    return mix
+
+def load_replay(path):
+    ops = []
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if not line.strip():
+                continue
+            entry = json.loads(line)
+            if entry["command"] not in OPERATIONS:
+                raise SystemExit(f"Operação desconhecida no replay: {entry['command']}")
+            ops.append((entry["command"], entry.get("user"), entry.get("args", {})))
+    return ops
+
+###############################
+# Execução e métricas
+###############################
+
+class Context:
+    def __init__(self, rng, guild, members, questions):
+        self.rng = rng
+        self.guild = guild
+        self.members = members
+        self.questions = questions
+        self.views = []
+
+async def monitor_loop_lag(interval, samples, stop):
+    """Mede o quanto o event loop atrasa para acordar uma tarefa agendada."""
+    loop = asyncio.get_running_loop()
+    while not stop.is_set():
+        start = loop.time()
+        await asyncio.sleep(interval)
+        samples.append(max(0.0, loop.time() - start - interval))
+
+def percentile(values, pct):
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+async def run_load(ctx, ops, concurrency, lag_interval):
+    latencies = {name: [] for name in OPERATIONS}
+    errors = {name: 0 for name in OPERATIONS}
+    skipped = {name: 0 for name in OPERATIONS}
+    queue = asyncio.Queue()
+    for op in ops:
+        queue.put_nowait(op)
+
+    async def worker():
+        while True:
+            try:
+                name, user_index, args = queue.get_nowait()
+            except asyncio.QueueEmpty:
+                return
+            user = ctx.rng.choice(ctx.members) if user_index is None else member_at(ctx, user_index)
+            start = time.perf_counter()
+            try:
+                result = await OPERATIONS[name](ctx, user, args)
+            except Exception as e:
+                errors[name] += 1
+                if errors[name] == 1:
+                    print(f"[erro] {name}: {e!r}")
+                continue
+            if result is False:
+                skipped[name] += 1
+            else:
+                latencies[name].append(time.perf_counter() - start)
+            # Devolve o controle ao loop, como aconteceria entre eventos do gateway
+            await asyncio.sleep(0)
+
+    lag_samples = []
+    stop = asyncio.Event()
+    monitor = asyncio.create_task(monitor_loop_lag(lag_interval, lag_samples, stop))
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    stop.set()
+    await monitor
+    return latencies, errors, skipped, lag_samples, elapsed
+
+def print_report(latencies, errors, skipped, lag_samples, elapsed):
+    total = sum(len(v) for v in latencies.values())
+    print(f"\nOperações concluídas: {total} em {elapsed:.2f}s ({total / elapsed if elapsed else 0:.1f} ops/s)")
+    print(f"Com erro: {sum(errors.values())} | Puladas (sem view aberta): {sum(skipped.values())}")
+    print(f"\n{'comando':<16}{'n':>7}{'erros':>7}{'puladas':>9}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'max ms':>10}")
+    for name, values in latencies.items():
+        if not values and not errors[name] and not skipped[name]:
+            continue
+        ms = [v * 1000 for v in values]
+        print(f"{name:<16}{len(ms):>7}{errors[name]:>7}{skipped[name]:>9}"
+              f"{percentile(ms, 50):>10.2f}{percentile(ms, 95):>10.2f}{percentile(ms, 99):>10.2f}{max(ms, default=0):>10.2f}")
+    lag_ms = [v * 1000 for v in lag_samples]
+    print(f"\nLag do event loop: média {statistics.fmean(lag_ms) if lag_ms else 0:.2f} ms, "
+          f"p99 {percentile(lag_ms, 99):.2f} ms, max {max(lag_ms, default=0):.2f} ms ({len(lag_ms)} amostras)")
+
+async def run(args):
+    rng = random.Random(args.seed)
+    roles = [FakeRole(1_000 + i, f"cargo{i}") for i in range(args.roles)]
+    seed_database(rng, roles)
+    members = build_members(rng, args.users, roles)
+    ctx = Context(rng, FakeGuild(members), members, main.load_questions())
+
+    # Aquecimento: registra uma parte dos usuários para que haja candidatos
+    warmup = [("register_match", i, {}) for i in range(int(args.users * args.prefill))]
+    warmup += [("import_test", i, {}) for i in range(0, int(args.users * args.prefill), 2)]
+    await run_load(ctx, warmup, args.concurrency, args.lag_interval)
+
+    if args.replay:
+        ops = load_replay(args.replay)
+    else:
+        mix = parse_mix(args.mix)
+        names = list(mix)
+        ops = [(name, None, {}) for name in rng.choices(names, weights=[mix[n] for n in names], k=args.ops)]
+
+    print(f"Banco temporário: {db.DB_PATH}")
+    print(f"Usuários: {args.users} | Concorrência: {args.concurrency} | Operações: {len(ops)}")
+    print_report(*await run_load(ctx, ops, args.concurrency, args.lag_interval))
+
+def main_cli():
+    parser = argparse.ArgumentParser(description="Teste de carga offline do bot de matchmaking.")
+    parser.add_argument("--users", type=int, default=100, help="Quantidade de membros falsos")
+    parser.add_argument("--roles", type=int, default=6, help="Quantidade de cargos falsos")
+    parser.add_argument("--prefill", type=float, default=0.8, help="Fração de usuários registrada antes do teste")
+    parser.add_argument("--ops", type=int, default=1000, help="Quantidade de operações sintéticas")
+    parser.add_argument("--concurrency", type=int, default=10, help="Operações simultâneas")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help="Pesos das operações (ex.: matchmake=4,perfil=1)")
+    parser.add_argument("--replay", help="Arquivo .jsonl com operações gravadas")
+    parser.add_argument("--lag-interval", type=float, default=0.01, help="Intervalo (s) da medição de lag")
+    parser.add_argument("--seed", type=int, default=0, help="Semente do gerador aleatório")
+    parser.add_argument("--keep-db", action="store_true", help="Mantém o banco temporário ao final")
+    args = parser.parse_args()
+    try:
+        asyncio.run(run(args))
+    finally:
+        db.conn.close()
+        if not args.keep_db:
+            shutil.rmtree(_tmp_dir, ignore_errors=True)
+
+if __name__ == "__main__":
+    main_cli()
@@ -1,6 +1,7 @@
 import discord
 from discord.ext import commands
 import json
+import math
 import re
 import database as db  # Certifique-se de que seu módulo "database" já tenha as tabelas necessárias
 
@@ -27,10 +28,130 @@ def load_questions():
             "weight": row[4]
         }
         if row[2] == "choice" and row[5]:
-            q["choices"] = row[5].split(",")
+            q["choices"] = parse_choices(row[5])
         questions.append(q)
     return questions
 
+def parse_choices(choices_text):
+    """Separa as opções de uma pergunta, removendo espaços e aspas residuais."""
+    return [c.strip().strip('"').strip() for c in choices_text.split(",") if c.strip().strip('"').strip()]
+
+def normalize_answer(q, raw_value):
+    """
+    Valida e converte uma resposta para a forma armazenada:
+      - perguntas "choice" viram o índice (int) da opção escolhida,
+      - perguntas "number" viram float.
+    Lança ValueError se a resposta for inválida.
+    """
+    if isinstance(raw_value, bool):
+        raise ValueError(f"Resposta inválida para **{q['key']}**.")
+    if q["type"] == "choice":
+        choices = q.get("choices", [])
+        if isinstance(raw_value, int):
+            if 0 <= raw_value < len(choices):
+                return raw_value
+            raise ValueError(f"Opção inválida para **{q['key']}**.")
+        value = str(raw_value).strip().lower()
+        for i, choice in enumerate(choices):
+            if choice.lower() == value:
+                return i
+        raise ValueError(f"Opção inválida para **{q['key']}**. Opções: {', '.join(choices)}")
+    elif q["type"] == "number":
+        try:
+            number = float(str(raw_value).strip().replace(",", "."))
+        except ValueError:
+            raise ValueError(f"A resposta para **{q['key']}** deve ser um número.")
+        if not math.isfinite(number) or not 0 <= number <= 100:
+            raise ValueError(f"A resposta para **{q['key']}** deve ser um número entre 0 e 100.")
+        return number
+    return str(raw_value).strip()
+
+def is_answerable(q):
+    """Perguntas "choice" sem opções cadastradas não podem ser respondidas."""
+    return q["type"] != "choice" or bool(q.get("choices"))
+
+def format_answer(q, value):
+    """Converte uma resposta armazenada de volta para texto legível."""
+    if q is None:
+        return str(value)
+    if q["type"] == "choice" and isinstance(value, int) and 0 <= value < len(q.get("choices", [])):
+        return q["choices"][value]
+    if q["type"] == "number" and isinstance(value, float) and value.is_integer():
+        return str(int(value))
+    return str(value)
+
+def normalize_answers(raw_answers, questions):
+    """
+    Normaliza um conjunto de respostas brutas. Respostas vazias e perguntas
+    sem opções são ignoradas. Retorna (respostas normalizadas, lista de erros).
+    """
+    answers = {}
+    errors = []
+    for q in questions:
+        if not is_answerable(q):
+            continue
+        raw_value = raw_answers.get(q["key"])
+        if raw_value is None or (isinstance(raw_value, str) and not raw_value.strip()):
+            continue
+        try:
+            answers[q["key"]] = normalize_answer(q, raw_value)
+        except ValueError as e:
+            errors.append(str(e))
+    return answers, errors
+
+def answer_placeholder(q):
+    """Texto de ajuda exibido no campo de resposta de uma pergunta."""
+    if q["type"] == "number":
+        return "Digite um número (0 a 100)..."
+    return "Digite aqui sua resposta..."
+
+def migrate_stored_answers():
+    """
+    Converte respostas antigas (texto livre) para a forma tipada.
+    Antes de alterar um registro, a versão original é salva em legacy_responses.
+    Respostas que não podem ser convertidas são removidas de responses (ficam
+    apenas no backup); chaves que não são perguntas atuais, como a bio, não
+    são alteradas. Retorna (usuários alterados, respostas removidas).
+    """
+    questions = load_questions()
+    changed_users = 0
+    dropped = []
+    db.cursor.execute("SELECT user_id, answers FROM responses")
+    for user_id, answers_json in db.cursor.fetchall():
+        stored = json.loads(answers_json)
+        answers = dict(stored)
+        for q in questions:
+            if q["key"] not in stored or not is_answerable(q):
+                continue
+            try:
+                answers[q["key"]] = normalize_answer(q, stored[q["key"]])
+            except ValueError:
+                del answers[q["key"]]
+                dropped.append((user_id, q["key"], stored[q["key"]]))
+                print(f"[migração] Resposta não convertida removida: usuário {user_id}, {q['key']} = {stored[q['key']]!r}")
+        if answers != stored:
+            db.cursor.execute(
+                "INSERT INTO legacy_responses (user_id, answers, migrated_at) VALUES (?, ?, datetime('now'))",
+                (user_id, answers_json)
+            )
+            db.cursor.execute("UPDATE responses SET answers = ? WHERE user_id = ?", (json.dumps(answers), user_id))
+            changed_users += 1
+    db.conn.commit()
+    return changed_users, dropped
+
+def remove_answers_for_question(key):
+    """
+    Remove de todos os usuários a resposta de uma pergunta apagada. Os índices
+    de opção armazenados não valeriam se a pergunta fosse recriada com a mesma
+    chave e outras opções.
+    """
+    db.cursor.execute("SELECT user_id, answers FROM responses")
+    for user_id, answers_json in db.cursor.fetchall():
+        answers = json.loads(answers_json)
+        if key in answers:
+            del answers[key]
+            db.cursor.execute("UPDATE responses SET answers = ? WHERE user_id = ?", (json.dumps(answers), user_id))
+
 def parse_bdsm_test(input_text):
     """Extrai os dados do BDSMTest a partir de um texto formatado."""
     results = {}
@@ -50,6 +171,8 @@ def parse_bdsm_test(input_text):
 def calc_match(user_answers, other_answers, questions):
     """
     Calcula a compatibilidade baseada nas respostas gerais.
+    As respostas devem estar normalizadas (índices de opção ou floats); valores
+    antigos em texto, ainda não migrados, são tratados como não respondidos.
     """
     score_total = 0
     score_max = 0
@@ -59,7 +182,7 @@ def calc_match(user_answers, other_answers, questions):
         score_max += weight * 100
         a = user_answers.get(key)
         b = other_answers.get(key)
-        if a is None or b is None:
+        if not isinstance(a, (int, float)) or not isinstance(b, (int, float)):
             continue
 
         if q["match_type"] == "similarity":
@@ -70,13 +193,8 @@ def calc_match(user_answers, other_answers, questions):
                 if a != b:
                     score_total += weight * 100
             elif q["type"] == "number":
-                try:
-                    a_num = float(a)
-                    b_num = float(b)
-                    diff = abs(a_num - b_num)
-                    score_total += weight * (100 - min(diff, 100))
-                except ValueError:
-                    pass
+                diff = abs(a - b)
+                score_total += weight * (100 - min(diff, 100))
     return (score_total / score_max) * 100 if score_max else 0
 
 def calc_bdsm_compatibility(user_test: dict, other_test: dict):
@@ -161,10 +279,11 @@ async def tutorial_admin(interaction: discord.Interaction):
     tutorial_text = (
         "**Tutorial de Administração do Matchmaking Bot**\n\n"
         "1. **/add_question**: Adiciona uma nova pergunta. Informe chave, texto (máx. 45 caracteres), tipo, match_type, peso e, se necessário, as opções separadas por vírgula.\n"
-        "2. **/delete_question**: Remove uma pergunta existente, informando a chave.\n"
+        "2. **/delete_question**: Remove uma pergunta existente (e as respostas a ela), informando a chave.\n"
         "3. **/edit_question**: Edita o texto de uma pergunta.\n"
         "4. **/add_role_compatibility**: Define a compatibilidade entre dois cargos.\n"
         "5. **/register_gender_role** e **/register_orientation_role**: Registre cargos que representam gêneros e orientações sexuais.\n"
+        "6. **/migrate_answers**: Converte respostas antigas (texto livre) para o formato validado. Execute uma vez após atualizar o bot.\n"
         "\nUtilize os comandos com atenção e verifique as respostas do bot para confirmar suas ações."
     )
     await interaction.response.send_message(tutorial_text, ephemeral=True)
@@ -194,10 +313,17 @@ async def add_question(interaction: discord.Interaction, key: str, question: str
     if len(question) > 45:
         await interaction.response.send_message("A pergunta não pode ultrapassar 45 caracteres!", ephemeral=True)
         return
+    choice_list = parse_choices(choices)
+    if q_type == "choice" and len(choice_list) < 2:
+        await interaction.response.send_message("Perguntas do tipo choice precisam de pelo menos duas opções!", ephemeral=True)
+        return
+    if q_type == "choice" and len(choice_list) > 25:
+        await interaction.response.send_message("Uma pergunta pode ter no máximo 25 opções!", ephemeral=True)
+        return
     try:
         db.cursor.execute(
             "INSERT INTO questions (key, question, type, match_type, weight, choices) VALUES (?, ?, ?, ?, ?, ?)",
-            (key, question, q_type, match_type, weight, choices)
+            (key, question, q_type, match_type, weight, ",".join(choice_list) if q_type == "choice" else "")
         )
         db.conn.commit()
         await interaction.response.send_message(f"Pergunta adicionada com sucesso: {question}", ephemeral=True)
@@ -215,6 +341,7 @@ async def delete_question(interaction: discord.Interaction, key: str):
         await interaction.response.send_message("Pergunta não encontrada!", ephemeral=True)
         return
     db.cursor.execute("DELETE FROM questions WHERE key = ?", (key,))
+    remove_answers_for_question(key)
     db.conn.commit()
     await interaction.response.send_message("Pergunta apagada com sucesso!", ephemeral=True)
 
@@ -298,10 +425,56 @@ async def register_orientation_role(interaction: discord.Interaction, role: disc
     except Exception:
         await interaction.response.send_message("Erro ao registrar o cargo de orientação.", ephemeral=True)
 
+# Migração única das respostas antigas em texto livre (Admin)
+@bot.tree.command(name="migrate_answers", description="Converte respostas antigas para o formato validado (Admin)")
+@discord.app_commands.checks.has_permissions(administrator=True)
+async def migrate_answers(interaction: discord.Interaction):
+    changed_users, dropped = migrate_stored_answers()
+    msg = f"Migração concluída: {changed_users} usuário(s) atualizado(s), {len(dropped)} resposta(s) inválida(s) removida(s)."
+    if dropped:
+        msg += "\nAs respostas originais foram salvas na tabela legacy_responses."
+    await interaction.response.send_message(msg, ephemeral=True)
+
 ###############################
 # Modais e Comandos de Respostas Gerais
 ###############################
 
+def create_answer_input(q, current=None, required=True):
+    """
+    Cria o campo de resposta de uma pergunta:
+      - perguntas "choice" usam um menu de seleção cujos valores são os índices das opções,
+      - as demais usam um campo de texto.
+    """
+    if q["type"] == "choice":
+        component = discord.ui.Select(
+            custom_id=q["key"],
+            placeholder="Escolha uma opção...",
+            options=[
+                discord.SelectOption(label=choice[:100], value=str(i), default=(i == current))
+                for i, choice in enumerate(q.get("choices", []))
+            ],
+            required=required
+        )
+    else:
+        component = discord.ui.TextInput(
+            custom_id=q["key"],
+            placeholder=answer_placeholder(q),
+            default=format_answer(q, current) if current is not None else None,
+            required=required
+        )
+    return discord.ui.Label(text=q["question"][:45], component=component)
+
+def read_modal_answers(modal):
+    """Lê as respostas enviadas em um modal criado com create_answer_input."""
+    raw_answers = {}
+    for item in modal.walk_children():
+        if isinstance(item, discord.ui.Select):
+            if item.values:
+                raw_answers[item.custom_id] = int(item.values[0])
+        elif isinstance(item, discord.ui.TextInput):
+            raw_answers[item.custom_id] = item.value
+    return raw_answers
+
 def create_match_modal(questions):
     """Modal dinâmico para registrar respostas gerais."""
     class MatchModal(discord.ui.Modal, title="Registro de Matchmaking"):
@@ -309,18 +482,18 @@ def create_match_modal(questions):
             super().__init__()
             self.answers = {}
             for q in questions:
-                self.add_item(
-                    discord.ui.TextInput(
-                        label=q["question"][:45],
-                        placeholder="Digite aqui sua resposta...",
-                        custom_id=q["key"],
-                        required=True
-                    )
-                )
+                self.add_item(create_answer_input(q))
 
         async def on_submit(self, interaction: discord.Interaction):
-            for item in self.children:
-                self.answers[item.custom_id] = item.value
+            raw_answers = read_modal_answers(self)
+            self.answers, errors = normalize_answers(raw_answers, questions)
+            if errors:
+                await interaction.response.send_message("Respostas inválidas:\n" + "\n".join(errors), ephemeral=True)
+                return
+            db.cursor.execute("SELECT answers FROM responses WHERE user_id = ?", (str(interaction.user.id),))
+            row = db.cursor.fetchone()
+            if row and "bio" in json.loads(row[0]):
+                self.answers["bio"] = json.loads(row[0])["bio"]
             db.cursor.execute(
                 "REPLACE INTO responses (user_id, answers) VALUES (?, ?)",
                 (str(interaction.user.id), json.dumps(self.answers))
@@ -331,14 +504,33 @@ def create_match_modal(questions):
 
 @bot.tree.command(name="register_match", description="Registre suas respostas para o matchmaking.")
 async def register_match(interaction: discord.Interaction):
-    questions = load_questions()
+    questions = [q for q in load_questions() if is_answerable(q)]
     if not questions:
         await interaction.response.send_message("Nenhuma pergunta configurada ainda!", ephemeral=True)
         return
     await interaction.response.send_modal(create_match_modal(questions))
 
+async def question_key_autocomplete(interaction: discord.Interaction, current: str):
+    """Sugere as chaves das perguntas cadastradas."""
+    return [
+        discord.app_commands.Choice(name=q["key"], value=q["key"])
+        for q in load_questions() if current.lower() in q["key"].lower()
+    ][:25]
+
+async def answer_value_autocomplete(interaction: discord.Interaction, current: str):
+    """Sugere as opções válidas da pergunta escolhida no campo "key"."""
+    key = interaction.namespace.key
+    q = next((q for q in load_questions() if q["key"] == key), None)
+    if q is None or q["type"] != "choice":
+        return []
+    return [
+        discord.app_commands.Choice(name=choice, value=choice)
+        for choice in q.get("choices", []) if current.lower() in choice.lower()
+    ][:25]
+
 @bot.tree.command(name="edit_answer", description="Edite sua resposta para uma pergunta específica.")
 @discord.app_commands.describe(key="Chave da pergunta", new_value="Nova resposta")
+@discord.app_commands.autocomplete(key=question_key_autocomplete, new_value=answer_value_autocomplete)
 async def edit_answer(interaction: discord.Interaction, key: str, new_value: str):
     db.cursor.execute("SELECT answers FROM responses WHERE user_id = ?", (str(interaction.user.id),))
     row = db.cursor.fetchone()
@@ -346,10 +538,15 @@ async def edit_answer(interaction: discord.Interaction, key: str, new_value: str
         await interaction.response.send_message("Você ainda não registrou suas respostas!", ephemeral=True)
         return
     answers = json.loads(row[0])
-    if key not in answers:
+    q = next((q for q in load_questions() if q["key"] == key), None)
+    if q is None:
         await interaction.response.send_message("Pergunta não encontrada!", ephemeral=True)
         return
-    answers[key] = new_value
+    try:
+        answers[key] = normalize_answer(q, new_value)
+    except ValueError as e:
+        await interaction.response.send_message(str(e), ephemeral=True)
+        return
     db.cursor.execute("UPDATE responses SET answers = ? WHERE user_id = ?", (json.dumps(answers), str(interaction.user.id)))
     db.conn.commit()
     await interaction.response.send_message("Resposta atualizada com sucesso!", ephemeral=True)
@@ -387,20 +584,16 @@ def create_edit_responses_modal(questions, current_answers):
             super().__init__()
             self.new_answers = {}
             for q in questions:
-                default_val = current_answers.get(q["key"], "")
-                self.add_item(
-                    discord.ui.TextInput(
-                        label=q["question"][:45],
-                        placeholder="Digite sua nova resposta...",
-                        default=default_val,
-                        custom_id=q["key"],
-                        required=False
-                    )
-                )
+                self.add_item(create_answer_input(q, current_answers.get(q["key"]), required=False))
 
         async def on_submit(self, interaction: discord.Interaction):
-            for item in self.children:
-                self.new_answers[item.custom_id] = item.value
+            raw_answers = read_modal_answers(self)
+            self.new_answers, errors = normalize_answers(raw_answers, questions)
+            if errors:
+                await interaction.response.send_message("Respostas inválidas:\n" + "\n".join(errors), ephemeral=True)
+                return
+            if "bio" in current_answers:
+                self.new_answers["bio"] = current_answers["bio"]
             db.cursor.execute("UPDATE responses SET answers = ? WHERE user_id = ?", (json.dumps(self.new_answers), str(interaction.user.id)))
             db.conn.commit()
             await interaction.response.send_message("Respostas gerais atualizadas com sucesso!", ephemeral=True)
@@ -408,10 +601,13 @@ def create_edit_responses_modal(questions, current_answers):
 
 @bot.tree.command(name="edit_responses", description="Edita todas as suas respostas gerais de matchmaking.")
 async def edit_responses(interaction: discord.Interaction):
-    questions = load_questions()
+    questions = [q for q in load_questions() if is_answerable(q)]
     db.cursor.execute("SELECT answers FROM responses WHERE user_id = ?", (str(interaction.user.id),))
     row = db.cursor.fetchone()
     current_answers = json.loads(row[0]) if row else {}
+    if not questions:
+        await interaction.response.send_message("Nenhuma pergunta configurada ainda!", ephemeral=True)
+        return
     await interaction.response.send_modal(create_edit_responses_modal(questions, current_answers))
 
 class EditBioModal(discord.ui.Modal, title="Editar Bio"):
@@ -571,12 +767,22 @@ async def matchmake(interaction: discord.Interaction):
 
 @bot.tree.command(name="search_match", description="Busca usuários com uma resposta específica para uma pergunta.")
 @discord.app_commands.describe(key="Chave da pergunta", value="Valor da resposta")
+@discord.app_commands.autocomplete(key=question_key_autocomplete, value=answer_value_autocomplete)
 async def search_match(interaction: discord.Interaction, key: str, value: str):
+    q = next((q for q in load_questions() if q["key"] == key), None)
+    if q is None:
+        await interaction.response.send_message("Pergunta não encontrada!", ephemeral=True)
+        return
+    try:
+        target = normalize_answer(q, value)
+    except ValueError as e:
+        await interaction.response.send_message(str(e), ephemeral=True)
+        return
     matching_users = []
     db.cursor.execute("SELECT user_id, answers FROM responses")
     for user_id, answers_json in db.cursor.fetchall():
         answers = json.loads(answers_json)
-        if answers.get(key, "").lower() == value.lower():
+        if answers.get(key) == target:
             matching_users.append(user_id)
     if matching_users:
         mentions = [bot.get_user(int(uid)).mention for uid in matching_users if bot.get_user(int(uid))]
@@ -598,7 +804,8 @@ async def perfil(interaction: discord.Interaction, usuario: discord.Member = Non
     if row:
         answers = json.loads(row[0])
         bio = answers.get("bio", "Bio não registrada.")
-        respostas = "\n".join([f"**{k}**: {v}" for k, v in answers.items() if k != "bio"])
+        questions_by_key = {q["key"]: q for q in load_questions()}
+        respostas = "\n".join([f"**{k}**: {format_answer(questions_by_key.get(k), v)}" for k, v in answers.items() if k != "bio"])
     else:
         bio = "Bio não registrada."
         respostas = "Nenhuma resposta registrada."
@@ -631,4 +838,5 @@ async def perfil(interaction: discord.Interaction, usuario: discord.Member = Non
     await interaction.response.send_message(embed=embed, ephemeral=True)
 
 # Executa o bot
-bot.run("MTMzNTAxNTQ1MzYzMzk0MTY1OA.GQkc1k.ayJVkOd57NgPvIan5bxFaXDoO9WnyQbLJmf4Yo")
+if __name__ == "__main__":
+    bot.run("MTMzNTAxNTQ1MzYzMzk0MTY1OA.GQkc1k.ayJVkOd57NgPvIan5bxFaXDoO9WnyQbLJmf4Yo")
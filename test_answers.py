@@ -0,0 +1,114 @@
+import json
+import os
+import tempfile
+
+import pytest
+
+pytest.importorskip("discord")
+
+# O banco temporário precisa ser definido antes de importar o bot
+os.environ["MATCHMAKING_DB"] = os.path.join(tempfile.mkdtemp(prefix="matchmake_test_"), "matchmaking.db")
+
+import database as db  # noqa: E402
+import main  # noqa: E402
+
+CHOICE = {"key": "cor", "question": "Cor favorita?", "type": "choice", "match_type": "similarity",
+          "weight": 1.0, "choices": ["Azul", "Verde", "Vermelho"]}
+NUMBER = {"key": "nota", "question": "Nota", "type": "number", "match_type": "complementary", "weight": 1.0}
+
+
+@pytest.fixture
+def clean_db():
+    for table in ("questions", "responses", "legacy_responses"):
+        db.cursor.execute(f"DELETE FROM {table}")
+    db.cursor.executemany(
+        "INSERT INTO questions (key, question, type, match_type, weight, choices) VALUES (?, ?, ?, ?, ?, ?)",
+        [
+            (CHOICE["key"], CHOICE["question"], "choice", "similarity", 1.0, '"Azul,Verde,Vermelho"'),
+            (NUMBER["key"], NUMBER["question"], "number", "complementary", 1.0, ""),
+        ]
+    )
+    db.conn.commit()
+    yield
+    for table in ("questions", "responses", "legacy_responses"):
+        db.cursor.execute(f"DELETE FROM {table}")
+    db.conn.commit()
+
+
+def stored_answers(user_id):
+    db.cursor.execute("SELECT answers FROM responses WHERE user_id = ?", (user_id,))
+    return json.loads(db.cursor.fetchone()[0])
+
+
+def test_choice_accepts_label_ignoring_case_and_spaces():
+    assert main.normalize_answer(CHOICE, "  verde ") == 1
+    assert main.normalize_answer(CHOICE, 2) == 2
+
+
+@pytest.mark.parametrize("value", ["Amarelo", "2", 3, -1, True])
+def test_choice_rejects_unknown_options(value):
+    with pytest.raises(ValueError):
+        main.normalize_answer(CHOICE, value)
+
+
+def test_choice_with_numeric_labels_has_no_positional_fallback():
+    q = dict(CHOICE, choices=["1", "2", "3", "5"])
+    assert main.normalize_answer(q, "5") == 3
+    with pytest.raises(ValueError):
+        main.normalize_answer(q, "4")
+
+
+def test_number_parses_to_float():
+    assert main.normalize_answer(NUMBER, " 42 ") == 42.0
+    assert main.normalize_answer(NUMBER, "50,5") == 50.5
+
+
+@pytest.mark.parametrize("value", ["abc", "nan", "inf", "-inf", "1e308", "-1", "100.5", False])
+def test_number_rejects_invalid_and_out_of_range(value):
+    with pytest.raises(ValueError):
+        main.normalize_answer(NUMBER, value)
+
+
+def test_normalize_answers_collects_errors_and_skips_blank_and_unanswerable():
+    empty_choice = dict(CHOICE, key="vazia", choices=[])
+    answers, errors = main.normalize_answers({"cor": "", "nota": "nan", "vazia": "x"}, [CHOICE, NUMBER, empty_choice])
+    assert answers == {}
+    assert len(errors) == 1
+
+
+def test_calc_match_ignores_unmigrated_text_answers():
+    assert main.calc_match({"cor": 0, "nota": 50.0}, {"cor": "Azul", "nota": "50"}, [CHOICE, NUMBER]) == 0
+    assert main.calc_match({"cor": 0, "nota": 50.0}, {"cor": 0, "nota": 40.0}, [CHOICE, NUMBER]) == 95
+
+
+def test_migration_converts_keeps_bio_and_unknown_keys_and_backs_up(clean_db):
+    original = {"cor": " azul", "nota": "sim", "bio": "oi", "antiga": "x"}
+    db.cursor.execute("INSERT INTO responses (user_id, answers) VALUES (?, ?)", ("1", json.dumps(original)))
+    db.conn.commit()
+
+    changed_users, dropped = main.migrate_stored_answers()
+
+    assert changed_users == 1
+    assert dropped == [("1", "nota", "sim")]
+    assert stored_answers("1") == {"cor": 0, "bio": "oi", "antiga": "x"}
+    db.cursor.execute("SELECT answers FROM legacy_responses WHERE user_id = ?", ("1",))
+    assert [json.loads(row[0]) for row in db.cursor.fetchall()] == [original]
+
+
+def test_migration_is_idempotent(clean_db):
+    db.cursor.execute("INSERT INTO responses (user_id, answers) VALUES (?, ?)",
+                      ("1", json.dumps({"cor": "Vermelho", "nota": "10"})))
+    db.conn.commit()
+    main.migrate_stored_answers()
+
+    assert main.migrate_stored_answers() == (0, [])
+    assert stored_answers("1") == {"cor": 2, "nota": 10.0}
+    db.cursor.execute("SELECT COUNT(*) FROM legacy_responses")
+    assert db.cursor.fetchone()[0] == 1
+
+
+def test_remove_answers_for_question(clean_db):
+    db.cursor.execute("INSERT INTO responses (user_id, answers) VALUES (?, ?)",
+                      ("1", json.dumps({"cor": 1, "nota": 10.0, "bio": "oi"})))
+    main.remove_answers_for_question("cor")
+    assert stored_answers("1") == {"nota": 10.0, "bio": "oi"}